@@ -1,11 +1,18 @@
 import os
-import json
 import asyncio
 import base64
+import atexit
+import logging
+import logging.handlers
+import queue
+import re
+import sys
+import time
 import warnings
 
 from pathlib import Path
 from dotenv import load_dotenv
+import orjson
 
 from google.genai.types import (
     Part,
@@ -17,7 +24,7 @@ from google.adk.runners import InMemoryRunner
 from google.adk.agents.live_request_queue import LiveRequestQueue
 from google.adk.agents.run_config import RunConfig
 
-from fastapi import FastAPI, WebSocket
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
 
@@ -26,6 +33,20 @@ from src.tools import InterviewTools
 
 warnings.filterwarnings("ignore", category=UserWarning, module="pydantic")
 
+# Log records are handed to a background thread through a queue so the
+# event loop never blocks on stdout
+log_queue: queue.SimpleQueue = queue.SimpleQueue()
+log_handler = logging.StreamHandler()
+log_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(message)s"))
+log_listener = logging.handlers.QueueListener(log_queue, log_handler)
+log_listener.start()
+atexit.register(log_listener.stop)
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.handlers.QueueHandler(log_queue))
+logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+logger.propagate = False
+
 #
 # ADK Streaming
 #
@@ -35,12 +56,36 @@ load_dotenv()
 
 APP_NAME = "ADK Streaming example"
 
+# WebSocket subprotocol for clients that exchange binary frames. Clients that
+# don't offer it fall back to JSON text frames.
+BINARY_SUBPROTOCOL = "prepgenius.binary"
+
+# First byte of every binary frame sent to the client. Binary frames from the
+# client are untagged raw PCM audio.
+FRAME_CONTROL = b"\x00"  # JSON control message
+FRAME_AUDIO = b"\x01"  # Raw PCM audio
+FRAME_TEXT = b"\x02"  # UTF-8 partial text
+
+# Partial text tokens are batched until this many seconds pass or characters
+# accumulate, whichever comes first
+TEXT_FLUSH_INTERVAL = 0.02
+TEXT_FLUSH_CHARS = 1024
+
+# Gemini closes a live session with 1008 (policy violation) or 1011
+# (internal error); these, and dropped connections, are resumable
+RECOVERABLE_ERROR = re.compile(
+    r"1008|1011|policy violation|internal error|ConnectionClosed", re.IGNORECASE
+)
+
+# Outbound frames are queued per connection and written by a single sender
+SEND_QUEUE_SIZE = 256
+SEND_DRAIN_TIMEOUT = 1.0
+
 
 async def start_agent_session(
     user_id: str,
     is_audio: bool = False,
     existing_tools: InterviewTools | None = None,
-    conversation_history: list | None = None,
 ):
     """
     Starts an agent session.
@@ -49,18 +94,13 @@ async def start_agent_session(
         user_id: User identifier
         is_audio: Whether to use audio mode
         existing_tools: Optional existing InterviewTools instance (for resumption)
-        conversation_history: Optional conversation history (for resumption)
 
     Returns:
         Tuple of (live_events, live_request_queue, interview_tools)
     """
 
-    # Create agent (will reuse tools if provided)
-    agent, interview_tools = create_agent(
-        user_id,
-        existing_tools=existing_tools,
-        conversation_history=conversation_history,
-    )
+    # Create agent (will reuse tools and their history if provided)
+    agent, interview_tools = create_agent(user_id, existing_tools=existing_tools)
 
     # Create a Runner
     runner = InMemoryRunner(
@@ -90,28 +130,170 @@ async def start_agent_session(
     return live_events, live_request_queue, interview_tools
 
 
-async def agent_to_client_messaging(websocket, live_events):
-    """Agent to client communication"""
+def encode_message(message: dict, binary: bool) -> bytes | str:
+    """Encodes a message as a frame of the negotiated type"""
+    payload = orjson.dumps(message)
+    if binary:
+        return FRAME_CONTROL + payload
+    return payload.decode()
+
+
+# The three possible turn_complete/interrupted messages, keyed by
+# (turn_complete, interrupted), and their frames pre-encoded per frame type
+TURN_MESSAGES = {
+    flags: {"turn_complete": flags[0], "interrupted": flags[1]}
+    for flags in ((True, False), (False, True), (True, True))
+}
+TURN_FRAMES = {
+    binary: {
+        flags: encode_message(message, binary)
+        for flags, message in TURN_MESSAGES.items()
+    }
+    for binary in (False, True)
+}
+
+
+async def send_frame(websocket: WebSocket, frame: bytes | str) -> None:
+    """Sends one encoded frame as a binary or text message"""
+    if isinstance(frame, bytes):
+        await websocket.send_bytes(frame)
+    else:
+        await websocket.send_text(frame)
+
+
+async def websocket_sender(websocket: WebSocket, out_queue: asyncio.Queue):
+    """
+    Sends queued frames to the client.
+
+    This is the only coroutine that writes to the websocket while a session
+    runs; producers just enqueue encoded frames. Send errors propagate so
+    they end the session.
+    """
     while True:
-        async for event in live_events:
-            # If the turn complete or interrupted, send it
-            if event.turn_complete or event.interrupted:
-                message = {
-                    "turn_complete": event.turn_complete,
-                    "interrupted": event.interrupted,
-                }
-                await websocket.send_text(json.dumps(message))
-                print(f"[AGENT TO CLIENT]: {message}")
-                continue
+        await send_frame(websocket, await out_queue.get())
+
+
+class SessionRestart(Exception):
+    """Raised by a session task when Gemini drops the live session"""
+
+
+class SessionEnded(Exception):
+    """Raised by a session task when it finishes, to stop the other tasks"""
+
+
+def is_recoverable_error(exception: BaseException) -> bool:
+    """Whether an error means the Gemini session closed and can be resumed"""
+    return RECOVERABLE_ERROR.search(str(exception)) is not None
+
+
+async def run_session_task(awaitable) -> None:
+    """
+    Runs one of the session's tasks inside its TaskGroup.
+
+    Whichever way the task finishes, the session ends: recoverable Gemini
+    errors become SessionRestart, other errors propagate as they are, and
+    normal completion raises SessionEnded so the TaskGroup cancels the rest.
+    """
+    try:
+        await awaitable
+    except Exception as e:
+        if is_recoverable_error(e):
+            raise SessionRestart(str(e)) from e
+        raise
+    raise SessionEnded
+
+
+async def agent_to_client_messaging(
+    out_queue: asyncio.Queue, live_events, binary: bool = False
+):
+    """
+    Agent to client communication.
+
+    Partial text tokens are coalesced for up to TEXT_FLUSH_INTERVAL seconds
+    (or TEXT_FLUSH_CHARS characters) and sent as a single frame.
+    """
+    loop = asyncio.get_running_loop()
+    turn_frames = TURN_FRAMES[binary]
+    pending_text: list[str] = []
+    pending_chars = 0
+    flush_deadline = 0.0
+
+    def take_text_frame():
+        """Encodes the buffered text as one frame and clears the buffer"""
+        nonlocal pending_chars
+        text = "".join(pending_text)
+        pending_text.clear()
+        pending_chars = 0
+        logger.debug("[AGENT TO CLIENT]: text/plain: %s", text)
+        if binary:
+            return FRAME_TEXT + text.encode()
+        return encode_message({"mime_type": "text/plain", "data": text}, binary)
+
+    async def flush_text():
+        if pending_text:
+            await out_queue.put(take_text_frame())
+
+    next_event = None
+    try:
+        while True:
+            # While text is buffered, race the next event against the flush
+            # deadline; otherwise just await the next event
+            if pending_text:
+                if next_event is None:
+                    next_event = asyncio.ensure_future(anext(live_events))
+                done, _ = await asyncio.wait(
+                    {next_event}, timeout=flush_deadline - loop.time()
+                )
+                if not done:
+                    await flush_text()
+                    continue
+
+            try:
+                if next_event is None:
+                    event = await anext(live_events)
+                else:
+                    event = await next_event
+            except StopAsyncIteration:
+                await flush_text()
+                return
+            finally:
+                next_event = None
 
             # Read the Content and its first Part
             part: Part = (
                 event.content and event.content.parts and event.content.parts[0]
             )
+
+            # If it's text and a parial text, buffer it
+            if (
+                part
+                and part.text
+                and event.partial
+                and not (event.turn_complete or event.interrupted)
+            ):
+                if not pending_text:
+                    flush_deadline = loop.time() + TEXT_FLUSH_INTERVAL
+                pending_text.append(part.text)
+                pending_chars += len(part.text)
+                if pending_chars >= TEXT_FLUSH_CHARS:
+                    await flush_text()
+                continue
+
+            # Any other event (turn boundary, audio, function call, ...)
+            # sends the buffered text first so it stays ahead
+            await flush_text()
+
+            # If the turn complete or interrupted, send it
+            if event.turn_complete or event.interrupted:
+                flags = (bool(event.turn_complete), bool(event.interrupted))
+                await out_queue.put(turn_frames[flags])
+                logger.info("[AGENT TO CLIENT]: %s", TURN_MESSAGES[flags])
+                continue
+
             if not part:
                 continue
 
-            # If it's audio, send Base64 encoded audio data
+            # If it's audio, send raw PCM (Base64 encoded for JSON clients)
             is_audio = getattr(part, "inline_data", None) and getattr(
                 part.inline_data, "mime_type", ""
             ).startswith("audio/pcm")
@@ -119,19 +301,29 @@ async def agent_to_client_messaging(websocket, live_events):
             if is_audio:
                 audio_data = part.inline_data and part.inline_data.data
                 if audio_data:
-                    message = {
-                        "mime_type": "audio/pcm",
-                        "data": base64.b64encode(audio_data).decode("ascii"),
-                    }
-                    await websocket.send_text(json.dumps(message))
-                    print(f"[AGENT TO CLIENT]: audio/pcm: {len(audio_data)} bytes.")
-                    continue
-
-            # If it's text and a parial text, send it
-            if part.text and event.partial:
-                message = {"mime_type": "text/plain", "data": part.text}
-                await websocket.send_text(json.dumps(message))
-                print(f"[AGENT TO CLIENT]: text/plain: {message}")
+                    if binary:
+                        await out_queue.put(FRAME_AUDIO + audio_data)
+                    else:
+                        message = {
+                            "mime_type": "audio/pcm",
+                            "data": base64.b64encode(audio_data).decode("ascii"),
+                        }
+                        await out_queue.put(encode_message(message, binary))
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug(
+                            f"[AGENT TO CLIENT]: audio/pcm: {len(audio_data)} bytes."
+                        )
+    finally:
+        if next_event is not None:
+            next_event.cancel()
+        # Cancellation or an error must not drop buffered text. The queue
+        # outlives the session and is drained before the socket closes, so
+        # hand it over without awaiting.
+        if pending_text:
+            try:
+                out_queue.put_nowait(take_text_frame())
+            except asyncio.QueueFull:
+                logger.warning("[AGENT TO CLIENT]: Send queue full, text dropped")
 
 
 async def client_to_agent_messaging(
@@ -140,9 +332,18 @@ async def client_to_agent_messaging(
     """Client to agent communication with elapsed time injection"""
     try:
         while True:
+            frame = await websocket.receive()
+            if frame["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(frame["code"], frame.get("reason"))
+
+            # Binary frames are raw PCM audio, forwarded without copying
+            raw = frame.get("bytes")
+            if raw is not None:
+                live_request_queue.send_realtime(Blob(data=raw, mime_type="audio/pcm"))
+                continue
+
             # Decode JSON message
-            message_json = await websocket.receive_text()
-            message = json.loads(message_json)
+            message = orjson.loads(frame["text"])
             mime_type = message["mime_type"]
             data = message["data"]
 
@@ -157,8 +358,9 @@ async def client_to_agent_messaging(
                     role="user", parts=[Part.from_text(text=text_with_timer)]
                 )
                 live_request_queue.send_content(content=content)
-                print(f"[CLIENT TO AGENT]: [{elapsed_time}] {data}")
+                logger.info("[CLIENT TO AGENT]: [%s] %s", elapsed_time, data)
             elif mime_type == "audio/pcm":
+                # Base64 audio from JSON clients; binary clients send raw frames.
                 # For audio mode, we cannot inject text - just send the audio
                 # The agent will receive timer info when user sends text messages
                 decoded_data = base64.b64decode(data)
@@ -171,11 +373,13 @@ async def client_to_agent_messaging(
                 live_request_queue.send_realtime(
                     Blob(data=decoded_data, mime_type=mime_type)
                 )
-                print(f"[CLIENT TO AGENT]: {mime_type}: {len(decoded_data)} bytes")
+                logger.debug(
+                    "[CLIENT TO AGENT]: %s: %d bytes", mime_type, len(decoded_data)
+                )
             else:
                 raise ValueError(f"Mime type not supported: {mime_type}")
     except Exception as e:
-        print(f"[CLIENT TO AGENT]: An unexpected error occurred: {e}")
+        logger.error("[CLIENT TO AGENT]: An unexpected error occurred: %s", e)
 
 
 #
@@ -198,13 +402,22 @@ async def root():
 async def websocket_endpoint(websocket: WebSocket, user_id: int, is_audio: str):
     """Client websocket endpoint with session resumption support"""
 
-    # Wait for client connection
-    await websocket.accept()
-    print(f"Client #{user_id} connected, audio mode: {is_audio}")
+    # Wait for client connection, negotiating binary frames if offered
+    binary = BINARY_SUBPROTOCOL in websocket.scope.get("subprotocols", [])
+    await websocket.accept(subprotocol=BINARY_SUBPROTOCOL if binary else None)
+    logger.info(
+        "Client #%s connected, audio mode: %s, binary frames: %s",
+        user_id,
+        is_audio,
+        binary,
+    )
 
     user_id_str = str(user_id)
     is_audio_mode = is_audio == "true"
 
+    # Outbound frames for this connection, shared across session restarts
+    out_queue: asyncio.Queue = asyncio.Queue(maxsize=SEND_QUEUE_SIZE)
+
     # Initialize tools outside the loop so they persist across restarts
     interview_tools = None
     session_count = 0
@@ -217,8 +430,10 @@ async def websocket_endpoint(websocket: WebSocket, user_id: int, is_audio: str):
             # Start or resume agent session
             if interview_tools is None:
                 # First session - create new tools
-                print(
-                    f"[SESSION]: Starting new session #{session_count} for client #{user_id}"
+                logger.info(
+                    "[SESSION]: Starting new session #%d for client #%s",
+                    session_count,
+                    user_id,
                 )
                 (
                     live_events,
@@ -227,11 +442,14 @@ async def websocket_endpoint(websocket: WebSocket, user_id: int, is_audio: str):
                 ) = await start_agent_session(user_id_str, is_audio_mode)
                 # Start the interview timer on first session
                 interview_tools.start_timer()
-                print(f"[TIMER]: Started for client #{user_id}")
+                logger.info("[TIMER]: Started for client #%s", user_id)
             else:
-                # Resuming - pass existing tools and conversation history
-                print(
-                    f"[SESSION]: Resuming session #{session_count} for client #{user_id} with {len(interview_tools.conversation_log)} messages"
+                # Resuming - pass existing tools, which carry the conversation history
+                logger.info(
+                    "[SESSION]: Resuming session #%d for client #%s with %d messages",
+                    session_count,
+                    user_id,
+                    len(interview_tools.roles),
                 )
                 (
                     live_events,
@@ -241,124 +459,110 @@ async def websocket_endpoint(websocket: WebSocket, user_id: int, is_audio: str):
                     user_id_str,
                     is_audio_mode,
                     existing_tools=interview_tools,
-                    conversation_history=interview_tools.conversation_log,
                 )
 
-            # Start tasks
-            agent_to_client_task = asyncio.create_task(
-                agent_to_client_messaging(websocket, live_events)
-            )
-            client_to_agent_task = asyncio.create_task(
-                client_to_agent_messaging(
-                    websocket, live_request_queue, interview_tools
-                )
-            )
-
             # Periodic timer task - sends elapsed time to the agent every minute
             async def periodic_timer_update():
-                """Sends elapsed time to the agent every 60 seconds"""
-                last_minute = -1
+                """Sends elapsed time to the agent at every whole minute"""
                 if interview_tools is None:
                     raise Exception("interview_tools is not defined!")
+                if interview_tools.start_time is None:
+                    raise Exception("interview timer is not started!")
+                last_minute = interview_tools.get_elapsed_seconds() // 60
 
                 while interview_tools.is_timer_running:
-                    await asyncio.sleep(5)  # Check every 5 seconds
+                    # Sleep until the interview crosses its next whole minute
+                    elapsed = time.monotonic() - interview_tools.start_time
+                    await asyncio.sleep(60 - elapsed % 60)
 
                     if not interview_tools.is_timer_running:
                         break
 
+                    # Timers may fire slightly early; send each minute once,
+                    # only after it has actually turned
+                    current_minute = interview_tools.get_elapsed_seconds() // 60
+                    if current_minute <= last_minute:
+                        continue
+                    last_minute = current_minute
+
                     elapsed_time = interview_tools.get_elapsed_time()
-                    # Parse minutes from elapsed time string (format: "Xm Ys")
+                    timer_message = f"[SYSTEM TIMER UPDATE: {elapsed_time} elapsed]"
+                    timer_content = Content(
+                        role="user", parts=[Part.from_text(text=timer_message)]
+                    )
                     try:
-                        current_minute = int(elapsed_time.split("m")[0])
-                    except (ValueError, IndexError):
-                        continue
+                        live_request_queue.send_content(content=timer_content)
+                        logger.info("[TIMER UPDATE]: Sent to agent - %s", elapsed_time)
+                    except Exception as e:
+                        logger.warning("[TIMER UPDATE]: Failed to send - %s", e)
+                        break
 
-                    # Send update only when we cross a new minute
-                    if current_minute > last_minute and current_minute > 0:
-                        last_minute = current_minute
-                        timer_message = f"[SYSTEM TIMER UPDATE: {elapsed_time} elapsed]"
-                        timer_content = Content(
-                            role="user", parts=[Part.from_text(text=timer_message)]
+            # Run until the websocket is disconnected, an error occurs, or
+            # interview ends; the first session task to finish stops the rest
+            restart = False
+            try:
+                async with asyncio.TaskGroup() as tg:
+                    tg.create_task(
+                        run_session_task(websocket_sender(websocket, out_queue))
+                    )
+                    tg.create_task(
+                        run_session_task(
+                            agent_to_client_messaging(out_queue, live_events, binary)
                         )
-                        try:
-                            live_request_queue.send_content(content=timer_content)
-                            print(f"[TIMER UPDATE]: Sent to agent - {elapsed_time}")
-                        except Exception as e:
-                            print(f"[TIMER UPDATE]: Failed to send - {e}")
-                            break
-
-            timer_task = asyncio.create_task(periodic_timer_update())
-
-            # Create a task to monitor the termination event
-            async def wait_for_termination() -> None:
-                assert interview_tools is not None
-                await interview_tools.termination_event.wait()
-                print(f"[TERMINATION]: Interview ended by agent for client #{user_id}")
-
-            termination_task = asyncio.create_task(wait_for_termination())
-
-            # Wait until the websocket is disconnected, an error occurs, or interview ends
-            tasks = [agent_to_client_task, client_to_agent_task, termination_task]
-            done, pending = await asyncio.wait(
-                tasks, return_when=asyncio.FIRST_COMPLETED
-            )
-
-            # Cancel timer task
-            timer_task.cancel()
-
-            # Check what completed
-            for task in done:
-                exception = task.exception() if not task.cancelled() else None
-                if exception:
-                    error_str = str(exception)
-                    # Check if this is a session timeout/error (Gemini closes with 1008 or 1011)
-                    if (
-                        "1008" in error_str
-                        or "1011" in error_str
-                        or "policy violation" in error_str.lower()
-                        or "internal error" in error_str.lower()
-                    ):
-                        print(
-                            f"[SESSION TIMEOUT]: Gemini session error for client #{user_id}, restarting..."
+                    )
+                    tg.create_task(
+                        run_session_task(
+                            client_to_agent_messaging(
+                                websocket, live_request_queue, interview_tools
+                            )
                         )
-                        # Cancel pending tasks
-                        for t in pending:
-                            t.cancel()
-                        live_request_queue.close()
-                        # Continue the loop to restart session
-                        continue
-                    else:
-                        # Some other error, raise it
-                        raise exception
-
-            # If termination event was set, interview ended normally
-            if interview_tools.termination_event.is_set():
-                print(f"[SESSION]: Interview completed normally for client #{user_id}")
-                for task in pending:
-                    task.cancel()
+                    )
+                    # Shielded so cancelling the session leaves the future pending
+                    tg.create_task(
+                        run_session_task(
+                            asyncio.shield(interview_tools.termination_future)
+                        )
+                    )
+                    tg.create_task(periodic_timer_update())
+            except* SessionRestart:
+                restart = True
+            except* SessionEnded:
+                pass
+            finally:
                 live_request_queue.close()
+
+            # If the termination future resolved, interview ended normally
+            if interview_tools.termination_future.done():
+                logger.info(
+                    "[TERMINATION]: Interview ended by agent for client #%s", user_id
+                )
+                logger.info(
+                    "[SESSION]: Interview completed normally for client #%s", user_id
+                )
                 break
 
+            # Gemini closed the live session (1008 or 1011), start a new one
+            if restart:
+                logger.warning(
+                    "[SESSION TIMEOUT]: Gemini session error for client #%s, restarting...",
+                    user_id,
+                )
+                continue
+
             # If we get here without exception, client probably disconnected
-            for task in pending:
-                task.cancel()
-            live_request_queue.close()
             break
 
         except Exception as e:
-            error_str = str(e)
-            print(f"[SESSION ERROR]: {error_str}")
+            # Task failures arrive wrapped by the TaskGroup
+            if isinstance(e, ExceptionGroup):
+                e = e.exceptions[0]
+            logger.error("[SESSION ERROR]: %s", e)
 
             # Check if this is a recoverable session error
-            if (
-                "1008" in error_str
-                or "1011" in error_str
-                or "policy violation" in error_str.lower()
-                or "internal error" in error_str.lower()
-                or "ConnectionClosed" in error_str
-            ):
-                print(f"[SESSION RESTART]: Attempting to resume for client #{user_id}")
+            if is_recoverable_error(e):
+                logger.info(
+                    "[SESSION RESTART]: Attempting to resume for client #%s", user_id
+                )
                 try:
                     live_request_queue.close()
                 except asyncio.CancelledError:
@@ -376,6 +580,14 @@ async def websocket_endpoint(websocket: WebSocket, user_id: int, is_audio: str):
     if interview_tools:
         interview_tools.stop_timer()
 
+    # Let queued frames reach the client before closing
+    try:
+        async with asyncio.timeout(SEND_DRAIN_TIMEOUT):
+            while not out_queue.empty():
+                await send_frame(websocket, out_queue.get_nowait())
+    except Exception:
+        pass  # Timed out or already closed
+
     # Close WebSocket gracefully
     try:
         await websocket.close()
@@ -383,4 +595,23 @@ async def websocket_endpoint(websocket: WebSocket, user_id: int, is_audio: str):
         pass  # Already closed
 
     # Disconnected
-    print(f"Client #{user_id} disconnected after {session_count} session(s)")
+    logger.info(
+        "Client #%s disconnected after %d session(s)", user_id, session_count
+    )
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    # Per-message deflate is disabled: the bulk of the traffic is raw PCM,
+    # which doesn't compress, and the remaining control/text frames are
+    # small and already batched, so deflating every frame only costs CPU.
+    uvicorn.run(
+        app,
+        host=os.getenv("HOST", "127.0.0.1"),
+        port=int(os.getenv("PORT", "8000")),
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools",
+        ws="websockets",
+        ws_per_message_deflate=False,
+    )
@@ -1,4 +1,5 @@
-from typing import Tuple, Optional, List, Dict, Any
+from itertools import islice
+from typing import Tuple, Optional
 from google.adk.agents.llm_agent import Agent
 
 from .tools import InterviewTools
@@ -48,41 +49,55 @@ high-fidelity mock interview tailored to specific company tiers. Talk in english
 """
 
 
-def format_conversation_history(conversation_log: List[Dict[str, Any]]) -> str:
-    """Formats conversation history for injection into agent prompt."""
-    if not conversation_log:
-        return ""
+HISTORY_HEADER = (
+    "\n### Previous Conversation (Session Resumed)\n"
+    "The following is the conversation history from the previous session. Continue from where you left off.\n"
+)
 
-    history_lines = ["\n### Previous Conversation (Session Resumed)"]
-    history_lines.append(
-        "The following is the conversation history from the previous session. Continue from where you left off.\n"
-    )
+HISTORY_FOOTER = (
+    "\n### Resume Interview\n"
+    "Continue the interview from where you left off. Do not repeat questions already asked."
+)
 
-    for entry in conversation_log:
-        role = entry.get("role", "unknown").upper()
-        content = entry.get("content", "")
-        history_lines.append(f"**{role}:** {content}")
 
-    history_lines.append("\n### Resume Interview")
-    history_lines.append(
-        "Continue the interview from where you left off. Do not repeat questions already asked."
-    )
+def format_conversation_history(tools: InterviewTools) -> str:
+    """
+    Formats conversation history for injection into agent prompt.
+
+    The formatted entries are cached on the tools, so each call only formats
+    the entries logged since the previous one.
+    """
+    if not tools.roles:
+        return ""
+
+    start = tools._history_cached_len
+    if start < len(tools.roles):
+        new_entries = "\n".join(
+            f"**{role.upper()}:** {content}"
+            for role, content in zip(
+                islice(tools.roles, start, None), islice(tools.contents, start, None)
+            )
+        )
+        if tools._history_cache:
+            tools._history_cache = f"{tools._history_cache}\n{new_entries}"
+        else:
+            tools._history_cache = new_entries
+        tools._history_cached_len = len(tools.roles)
 
-    return "\n".join(history_lines)
+    return "\n".join((HISTORY_HEADER, tools._history_cache, HISTORY_FOOTER))
 
 
 def create_agent(
     session_id: str,
     existing_tools: Optional[InterviewTools] = None,
-    conversation_history: Optional[List[Dict[str, Any]]] = None,
 ) -> Tuple[Agent, "InterviewTools"]:
     """
     Creates an agent and its associated tools for a session.
 
     Args:
         session_id: Unique identifier for the session
-        existing_tools: Optional existing InterviewTools instance (for session resumption)
-        conversation_history: Optional conversation history to inject into prompt
+        existing_tools: Optional existing InterviewTools instance (for session resumption);
+            its conversation history is injected into the prompt
 
     Returns:
         Tuple of (Agent, InterviewTools)
@@ -95,8 +110,8 @@ def create_agent(
     instruction = INTERVIEW_PROMPT
 
     # If resuming, inject conversation history
-    if conversation_history:
-        history_context = format_conversation_history(conversation_history)
+    if existing_tools:
+        history_context = format_conversation_history(tools)
         instruction = INTERVIEW_PROMPT + history_context
 
     # ADK automatically wraps Python functions as FunctionTools
@@ -1,28 +1,70 @@
 import asyncio
+import sys
 import time
 from typing import Dict, List, Any, Optional
 from .db import db_instance
 
 class InterviewTools:
+    # One instance per client session; slots keep them small and fast to access
+    __slots__ = (
+        "session_id",
+        "roles",
+        "contents",
+        "timestamps",
+        "_history_cache",
+        "_history_cached_len",
+        "termination_future",
+        "start_time",
+        "is_timer_running",
+        "_last_sec",
+        "_last_str",
+    )
+
     def __init__(self, session_id: str):
         self.session_id = session_id
-        # In-memory storage for the conversation artifact
-        self.conversation_log: List[Dict[str, Any]] = []
-        # Event to signal interview termination
-        self.termination_event = asyncio.Event()
+        # In-memory storage for the conversation artifact, one list per field
+        self.roles: List[str] = []
+        self.contents: List[str] = []
+        self.timestamps: List[Optional[str]] = []
+        # Formatted history entries, extended incrementally on session resume
+        self._history_cache: str = ""
+        self._history_cached_len: int = 0
+        # Resolved to signal interview termination; created by start_timer
+        self.termination_future: Optional[asyncio.Future] = None
         # Timer tracking
         self.start_time: Optional[float] = None
         self.is_timer_running: bool = False
+        # Last formatted elapsed time, reused within the same second
+        self._last_sec: int = -1
+        self._last_str: str = "0m 0s"
+
+    @property
+    def conversation_log(self) -> List[Dict[str, Any]]:
+        """Materializes the conversation as a list of entry dicts."""
+        return [
+            {"role": role, "content": content, "timestamp": timestamp}
+            for role, content, timestamp in zip(
+                self.roles, self.contents, self.timestamps
+            )
+        ]
 
     def start_timer(self) -> None:
-        """Starts the session timer."""
-        self.start_time = time.time()
+        """Starts the session timer. Must be called from the event loop."""
+        if self.termination_future is None:
+            self.termination_future = asyncio.get_running_loop().create_future()
+        self.start_time = time.monotonic()
         self.is_timer_running = True
 
     def stop_timer(self) -> None:
         """Stops the session timer."""
         self.is_timer_running = False
 
+    def get_elapsed_seconds(self) -> int:
+        """Returns the whole seconds elapsed since the interview started."""
+        if self.start_time is None:
+            return 0
+        return int(time.monotonic() - self.start_time)
+
     def get_elapsed_time(self) -> str:
         """
         Returns the elapsed time since the interview started.
@@ -34,10 +76,14 @@ class InterviewTools:
         if not self.is_timer_running:
             return "Timer stopped"
         
-        elapsed = time.time() - self.start_time
-        minutes = int(elapsed // 60)
-        seconds = int(elapsed % 60)
-        return f"{minutes}m {seconds}s"
+        elapsed = int(time.monotonic() - self.start_time)
+        if elapsed == self._last_sec:
+            return self._last_str
+
+        minutes, seconds = divmod(elapsed, 60)
+        self._last_sec = elapsed
+        self._last_str = f"{minutes}m {seconds}s"
+        return self._last_str
 
     def update_interview_log(self, role: str, content: str) -> str:
         """
@@ -48,12 +94,12 @@ class InterviewTools:
             role: 'agent' or 'user'
             content: The text content of the message.
         """
-        entry = {
-            "role": role,
-            "content": content,
-            "timestamp": self.get_elapsed_time() if self.is_timer_running else None
-        }
-        self.conversation_log.append(entry)
+        # Roles are a tiny fixed set, so every entry can share one string
+        self.roles.append(sys.intern(role))
+        self.contents.append(content)
+        self.timestamps.append(
+            self.get_elapsed_time() if self.is_timer_running else None
+        )
         return f"Logged {role} message."
 
     async def submit_interview_session_async(self) -> str:
@@ -85,7 +131,8 @@ class InterviewTools:
         """
         # Stop the timer
         self.stop_timer()
-        # Set the termination event to signal main.py to close the connection
-        self.termination_event.set()
+        # Resolve the termination future to signal main.py to close the connection
+        if self.termination_future is not None and not self.termination_future.done():
+            self.termination_future.set_result(None)
         return f"Interview ended. Summary: {summary}"
 
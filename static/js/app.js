@@ -5,6 +5,12 @@
 
 const sessionId = Math.random().toString().substring(10);
 let websocket = null;
+const BINARY_SUBPROTOCOL = "prepgenius.binary";
+// First byte of every binary frame from the server
+const FRAME_CONTROL = 0;
+const FRAME_AUDIO = 1;
+const FRAME_TEXT = 2;
+const textDecoder = new TextDecoder();
 let is_audio = false;
 let isInterviewActive = false;
 
@@ -145,7 +151,8 @@ function connectWebsocket() {
   const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
   const ws_url = `${protocol}//${window.location.host}/ws/${sessionId}`;
   
-  websocket = new WebSocket(ws_url + "?is_audio=" + is_audio);
+  websocket = new WebSocket(ws_url + "?is_audio=" + is_audio, [BINARY_SUBPROTOCOL]);
+  websocket.binaryType = "arraybuffer";
 
   websocket.onopen = function () {
     console.log("WebSocket connection opened.");
@@ -161,43 +168,26 @@ function connectWebsocket() {
   };
 
   websocket.onmessage = function (event) {
-    const message_from_server = JSON.parse(event.data);
-    console.log("[AGENT TO CLIENT] ", message_from_server);
-
-    // Check if turn is complete
-    if (message_from_server.turn_complete === true) {
-      currentMessageId = null;
+    // JSON clients receive text frames only
+    if (typeof event.data === "string") {
+      handleServerMessage(JSON.parse(event.data));
       return;
     }
 
-    // Check for interrupt
-    if (message_from_server.interrupted === true) {
-      if (audioPlayerNode) {
-        audioPlayerNode.port.postMessage({ command: "endOfAudio" });
-      }
-      return;
-    }
-
-    // Handle audio
-    if (message_from_server.mime_type === "audio/pcm" && audioPlayerNode) {
-      audioPlayerNode.port.postMessage(base64ToArray(message_from_server.data));
-    }
-
-    // Handle text
-    if (message_from_server.mime_type === "text/plain") {
-      if (currentMessageId === null) {
-        currentMessageId = Math.random().toString(36).substring(7);
-        const message = document.createElement("div");
-        message.id = currentMessageId;
-        message.className = "message agent";
-        messagesDiv.appendChild(message);
-        messageCounter++;
-        updateMessageCount();
-      }
-
-      const message = document.getElementById(currentMessageId);
-      message.textContent += message_from_server.data;
-      messagesDiv.scrollTop = messagesDiv.scrollHeight;
+    // Binary frames: first byte is the frame kind
+    const frame = new Uint8Array(event.data);
+    switch (frame[0]) {
+      case FRAME_CONTROL:
+        handleServerMessage(JSON.parse(textDecoder.decode(frame.subarray(1))));
+        break;
+      case FRAME_AUDIO:
+        playAudio(event.data.slice(1));
+        break;
+      case FRAME_TEXT:
+        appendAgentText(textDecoder.decode(frame.subarray(1)));
+        break;
+      default:
+        console.warn("Unknown frame kind: ", frame[0]);
     }
   };
 
@@ -216,6 +206,56 @@ function connectWebsocket() {
   };
 }
 
+function handleServerMessage(message_from_server) {
+  console.log("[AGENT TO CLIENT] ", message_from_server);
+
+  // Check if turn is complete
+  if (message_from_server.turn_complete === true) {
+    currentMessageId = null;
+    return;
+  }
+
+  // Check for interrupt
+  if (message_from_server.interrupted === true) {
+    if (audioPlayerNode) {
+      audioPlayerNode.port.postMessage({ command: "endOfAudio" });
+    }
+    return;
+  }
+
+  // Handle audio
+  if (message_from_server.mime_type === "audio/pcm" && audioPlayerNode) {
+    playAudio(base64ToArray(message_from_server.data));
+  }
+
+  // Handle text
+  if (message_from_server.mime_type === "text/plain") {
+    appendAgentText(message_from_server.data);
+  }
+}
+
+function playAudio(pcmBuffer) {
+  if (audioPlayerNode) {
+    audioPlayerNode.port.postMessage(pcmBuffer, [pcmBuffer]);
+  }
+}
+
+function appendAgentText(text) {
+  if (currentMessageId === null) {
+    currentMessageId = Math.random().toString(36).substring(7);
+    const message = document.createElement("div");
+    message.id = currentMessageId;
+    message.className = "message agent";
+    messagesDiv.appendChild(message);
+    messageCounter++;
+    updateMessageCount();
+  }
+
+  const message = document.getElementById(currentMessageId);
+  message.textContent += text;
+  messagesDiv.scrollTop = messagesDiv.scrollHeight;
+}
+
 function disconnectWebsocket() {
   if (websocket) {
     websocket.close();
@@ -399,11 +439,18 @@ function sendBufferedAudio() {
     offset += chunk.length;
   }
 
-  sendMessage({
-    mime_type: "audio/pcm",
-    data: arrayBufferToBase64(combinedBuffer.buffer),
-  });
-  console.log("[CLIENT TO AGENT] sent %s bytes", combinedBuffer.byteLength);
+  // Binary clients send the PCM as-is; the server forwards it untouched
+  if (websocket && websocket.protocol === BINARY_SUBPROTOCOL) {
+    if (websocket.readyState === WebSocket.OPEN) {
+      websocket.send(combinedBuffer);
+    }
+  } else {
+    sendMessage({
+      mime_type: "audio/pcm",
+      data: arrayBufferToBase64(combinedBuffer.buffer),
+    });
+  }
+  console.log("[CLIENT TO AGENT] sent %s bytes", totalLength);
 
   audioBuffer = [];
 }